@@ -5,15 +5,20 @@ Calculates effective interest rates (IRR) and weighted average life for loan tra
 """
 
 import os
+import sys
 from flask import Flask, render_template, request, jsonify, Response, session, redirect, url_for
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
 import numpy_financial as npf
 import numpy as np
+import orjson
+from numba import njit
 import csv
 import io
 import json
 import math
+import functools
+import hashlib
+from dataclasses import dataclass, fields
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'nadb-aim-dev-secret-2024')
@@ -28,60 +33,269 @@ def parse_date(s):
     return datetime.strptime(s, "%Y-%m-%d")
 
 
-def period_date(start: datetime, period: int, frequency_months: int) -> datetime:
-    """Return the date for a given period index (period 0 = start)."""
-    return start + relativedelta(months=period * frequency_months)
-
+def period_dates(start: datetime, num_periods: int, frequency_months: int) -> np.ndarray:
+    """
+    Return the dates for periods 0..num_periods as a datetime64[D] array.
 
-def days_between(d1: datetime, d2: datetime) -> int:
-    """Actual days between two dates."""
-    return (d2 - d1).days
+    Period p falls frequency_months × p calendar months after start, with the
+    day of month clamped to the target month's length (Jan 31 → Feb 29 → Mar 31).
+    """
+    month_starts = (np.datetime64(start.strftime("%Y-%m"), "M")
+                    + np.arange(num_periods + 1) * frequency_months)
+    first_days    = month_starts.astype("datetime64[D]")
+    month_lengths = (month_starts + 1).astype("datetime64[D]") - first_days
+    day_offsets   = np.minimum(start.day, month_lengths.astype(np.int64)) - 1
+    return first_days + day_offsets.astype("timedelta64[D]")
 
 
 # ---------------------------------------------------------------------------
 # Amortization profile
 # ---------------------------------------------------------------------------
 
-def adhoc_payment(loan_amount: float, period_months: int,
-                  adhoc_table: list, use_percent: bool) -> float:
+def adhoc_amortization(loan_amount: float, month_offsets: np.ndarray,
+                       adhoc_table: list, use_percent: bool) -> np.ndarray:
     """
-    Look up the amortization payment for the given period_months offset.
+    Ad-hoc amortization payment for every period, before the balance cap.
 
-    adhoc_table: list of {"month": int, "value": float} sorted by month.
+    month_offsets: months from disbursement to each period date.
+    adhoc_table: list of {"month": int, "value": float}, any order.
     use_percent: if True, value is % of loan_amount (e.g. 1.5 → 1.5%); else dollar amount.
-    Returns the payment amount for this period.
+    Each period takes the value of the last entry with month <= its offset, or 0.0
+    if there is none. The table is sorted once and looked up with searchsorted.
     """
     if not adhoc_table:
-        return 0.0
+        return np.zeros(month_offsets.size, dtype=np.float64)
 
-    # Find the closest month <= period_months
-    applicable = None
-    for row in sorted(adhoc_table, key=lambda r: r["month"]):
-        if row["month"] <= period_months:
-            applicable = row
-        else:
-            break
+    adhoc_sorted = sorted(adhoc_table, key=lambda r: r["month"])
+    months = np.array([r["month"] for r in adhoc_sorted], dtype=np.float64)
+    values = np.array([r["value"] for r in adhoc_sorted], dtype=np.float64)
+    if use_percent:
+        values = loan_amount * (values / 100.0)
 
-    if applicable is None:
-        return 0.0
+    idx = np.searchsorted(months, month_offsets, side="right") - 1
+    return np.where(idx >= 0, values[idx.clip(0)], 0.0)
 
-    value = applicable["value"]
-    if use_percent:
-        return loan_amount * (value / 100.0)
+
+def mortgage_amortization(loan_amount: float, num_periods: int, draw_period: int,
+                          mortgage_pmt: float, mortgage_r: float) -> np.ndarray:
+    """
+    Level-payment principal for every period, before the final-period clear-out.
+
+    Repayment starts after draw_period. The balance k payments in follows the
+    closed form B_k = L·(1+r)^k − PMT·((1+r)^k − 1)/r for any r > -1
+    (B_k = L − PMT·k at r = 0), floored at zero; principal is the drop in
+    balance each period. If PMT does not cover the periodic interest, no
+    principal is ever repaid.
+    """
+    amort = np.zeros(num_periods + 1, dtype=np.float64)
+    start = max(draw_period, 0)
+    n_pay = num_periods - start
+    if n_pay <= 0 or mortgage_pmt <= mortgage_r * loan_amount:
+        return amort
+
+    k = np.arange(n_pay + 1, dtype=np.float64)
+    if mortgage_r != 0:
+        # (1+r)^k − 1 via expm1/log1p: valid for any r > -1 and accurate as r -> 0
+        growth_m1 = np.expm1(k * np.log1p(mortgage_r))
+        balances  = loan_amount * (growth_m1 + 1) - mortgage_pmt * growth_m1 / mortgage_r
     else:
-        return value
+        balances = loan_amount - mortgage_pmt * k
+    np.maximum(balances, 0.0, out=balances)
+
+    amort[start + 1:] = -np.diff(balances)
+    return amort
 
 
 # ---------------------------------------------------------------------------
 # Core amortization schedule
 # ---------------------------------------------------------------------------
 
-def build_schedule(params: dict) -> list:
+AMORT_PROFILE_CODES = {"Bullet": 0, "Ad-hoc": 1, "Mortgage": 2}
+
+MONEY_COLUMNS = ("beginning_bal", "draws", "amortization", "interest",
+                 "upfront_fee", "commitment_fee", "ending_bal")
+
+
+@dataclass(frozen=True, eq=False)
+class Schedule:
+    """
+    Amortization schedule as parallel column arrays, index = period (0..num_periods).
+
+    Per-row dicts are only materialized at the JSON/CSV boundary. The arrays are
+    read-only so a cached Schedule can be shared between requests.
+    """
+    period:         np.ndarray   # int64
+    date:           np.ndarray   # datetime64[D]
+    days:           np.ndarray   # int64, actual days since the previous period
+    beginning_bal:  np.ndarray   # float64 from here on
+    draws:          np.ndarray
+    amortization:   np.ndarray
+    interest:       np.ndarray
+    upfront_fee:    np.ndarray
+    commitment_fee: np.ndarray
+    ending_bal:     np.ndarray
+
+    def __post_init__(self):
+        for f in fields(self):
+            getattr(self, f.name).flags.writeable = False
+
+    def column_lists(self, decimals: int = None) -> list:
+        """
+        All ten columns as Python lists in field order, dates as ISO strings.
+
+        decimals: if given, money columns are rounded with one np.round per column.
+        """
+        money = [getattr(self, name) for name in MONEY_COLUMNS]
+        if decimals is not None:
+            money = [np.round(col, decimals) for col in money]
+        return [
+            self.period.tolist(),
+            np.datetime_as_string(self.date, unit="D").tolist(),
+            self.days.tolist(),
+        ] + [col.tolist() for col in money]
+
+
+# Bump whenever _schedule_kernel's signature or semantics change, so a stale
+# aim_kernels build is ignored instead of failing at request time.
+SCHEDULE_KERNEL_VERSION = 1
+
+
+@njit(cache=True)
+def _schedule_kernel(loan_amount, num_periods, draw_period, amort_profile_code,
+                     amort_raw, out_beginning_bal, out_amortization, out_ending_bal):
+    """
+    Run the balance recurrence for periods 0..num_periods, filling the columns in place.
+
+    Only amortization and the running balance are serial; interest, fees and draws
+    are derived from the balance columns afterwards in build_schedule.
+    amort_profile_code: 0 = Bullet, 1 = Ad-hoc, 2 = Mortgage, anything else = none.
+    amort_raw: the profile's scheduled principal per period before the balance
+               cap (adhoc_amortization / mortgage_amortization; unused for Bullet).
+    """
+    # Period 0: initial draw
+    out_beginning_bal[0] = 0.0
+    out_amortization[0]  = 0.0
+    out_ending_bal[0]    = loan_amount
+    balance = loan_amount
+
+    for p in range(1, num_periods + 1):
+        beginning_bal = balance
+        out_beginning_bal[p] = beginning_bal
+
+        # Amortization
+        if amort_profile_code == 0:
+            if p == num_periods:
+                amort = beginning_bal   # Full repayment at final period
+            else:
+                amort = 0.0
+        elif amort_profile_code == 1:
+            # Cap to remaining balance (never let balance go negative)
+            amort = min(amort_raw[p], beginning_bal)
+        elif amort_profile_code == 2:
+            if p <= draw_period:
+                amort = 0.0
+            else:
+                # Fixed PMT minus the mortgage-rate interest component
+                amort = min(amort_raw[p], beginning_bal)
+                # On the final period, clear any remaining balance
+                if p == num_periods:
+                    amort = beginning_bal
+        else:
+            amort = 0.0
+
+        out_amortization[p] = amort
+
+        ending_bal = beginning_bal - amort
+        balance = max(ending_bal, 0.0)
+        out_ending_bal[p] = balance
+
+
+# Prefer the ahead-of-time build from build_kernels.py (no JIT warmup on the
+# first request); fall back to the @njit kernel when it hasn't been compiled
+# or was built from an older kernel.
+try:
+    import aim_kernels
+    if aim_kernels.kernel_version() != SCHEDULE_KERNEL_VERSION:
+        raise ImportError("stale aim_kernels build")
+    schedule_kernel = aim_kernels.schedule_kernel
+except (ImportError, AttributeError) as e:
+    if not isinstance(e, ModuleNotFoundError):
+        app.logger.warning("Ignoring aim_kernels (%s); rerun build_kernels.py", e)
+    schedule_kernel = _schedule_kernel
+
+
+def balance_path(loan_amount: float, num_periods: int, draw_period: int,
+                 amort_profile_code: int, amort_raw: np.ndarray) -> tuple:
+    """
+    Return (beginning_bal, amortization, ending_bal) columns for periods 0..num_periods.
+
+    With non-negative scheduled principal the balance cap is a running total
+    clipped at loan_amount, so the recurrence collapses to a cumulative sum;
+    Bullet and Mortgage then clear whatever remains in their final period.
+    Anything else (e.g. negative ad-hoc values) falls back to the serial kernel.
+    """
+    size = num_periods + 1
+    if amort_profile_code == 1 or amort_profile_code == 2:
+        amortization = amort_raw.copy()
+        amortization[0] = 0.0
+    else:
+        amortization = np.zeros(size, dtype=np.float64)
+
+    if loan_amount >= 0 and (amortization >= 0).all():
+        clears_final = num_periods > 0 and (
+            amort_profile_code == 0
+            or (amort_profile_code == 2 and num_periods > draw_period))
+
+        repaid = np.minimum(np.cumsum(amortization), loan_amount)
+        if clears_final:
+            repaid[-1] = loan_amount
+        amortization = np.diff(repaid, prepend=0.0)
+        ending_bal = loan_amount - repaid
+        beginning_bal = np.empty(size, dtype=np.float64)
+        beginning_bal[0] = 0.0
+        beginning_bal[1:] = ending_bal[:-1]
+        return beginning_bal, amortization, ending_bal
+
+    beginning_bal = np.empty(size, dtype=np.float64)
+    amortization  = np.empty(size, dtype=np.float64)
+    ending_bal    = np.empty(size, dtype=np.float64)
+    schedule_kernel(loan_amount, num_periods, draw_period, amort_profile_code,
+                    amort_raw, beginning_bal, amortization, ending_bal)
+    return beginning_bal, amortization, ending_bal
+
+
+def _freeze(params: dict) -> str:
+    """Canonical, hashable form of params (JSON with sorted keys) used as cache key."""
+    return json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+def schedule_id(params: dict) -> str:
+    """Stable id for the schedule built from params (same key build_schedule caches on)."""
+    return hashlib.sha1(_freeze(params).encode("utf-8")).hexdigest()
+
+
+def build_schedule(params: dict) -> Schedule:
     """
     Build the full period-by-period amortization schedule.
 
-    Returns a list of dicts, one per period (0 to num_periods inclusive).
+    Results are memoized on the canonicalized params, so /calculate and
+    /export/csv for the same inputs share one build.
+    Returns a Schedule covering periods 0 to num_periods inclusive.
     """
+    return _build_schedule_cached(_freeze(params))
+
+
+@functools.lru_cache(maxsize=128)
+def _build_schedule_cached(frozen_params: str) -> Schedule:
+    """
+    Schedule build keyed on the output of _freeze(params).
+
+    Dates, day counts and the profile's scheduled principal are resolved here;
+    the balance columns come from balance_path and the remaining columns are
+    computed as whole arrays.
+    """
+    params = json.loads(frozen_params)
+
     loan_amount      = float(params["loan_amount"])
     num_periods      = int(params["num_periods"])
     draw_period      = int(params["draw_period"])
@@ -111,117 +325,86 @@ def build_schedule(params: dict) -> list:
         mortgage_r           = mortgage_annual_rate / periods_per_year
         n_amort              = int(round(mortgage_amort_years * periods_per_year))
         if n_amort > 0:
+            # 1 - (1+r)^-n via expm1/log1p: accurate as r -> 0. Non-positive rates keep
+            # the straight-line PMT; mortgage_amortization's closed form is exact for
+            # any PMT, so the balance path still follows PMT - r × balance.
             if mortgage_r > 0:
-                mortgage_pmt = loan_amount * mortgage_r / (1 - (1 + mortgage_r) ** -n_amort)
+                denom = -math.expm1(-n_amort * math.log1p(mortgage_r))
+                mortgage_pmt = loan_amount * mortgage_r / denom
             else:
                 mortgage_pmt = loan_amount / n_amort
 
-    schedule = []
-    balance = 0.0
-
-    for p in range(num_periods + 1):
-        row = {}
-        row["period"] = p
-        p_date = period_date(disburse_dt, p, freq_months)
-        row["date"] = p_date.strftime("%Y-%m-%d")
-
-        # Period 0: initial draw
-        if p == 0:
-            row["days"]           = 0
-            row["beginning_bal"]  = 0.0
-            row["draws"]          = loan_amount
-            row["amortization"]   = 0.0
-            row["interest"]       = 0.0
-            row["upfront_fee"]    = loan_amount * upfront_fee_rate
-            row["commitment_fee"] = 0.0
-            row["ending_bal"]     = loan_amount
-            balance = loan_amount
-
-        else:
-            prev_date = period_date(disburse_dt, p - 1, freq_months)
-            days = days_between(prev_date, p_date)
-            row["days"] = days
-
-            beginning_bal = balance
-            row["beginning_bal"] = beginning_bal
-
-            # No draws after period 0 in this model
-            row["draws"] = 0.0
-
-            # Margin: draw vs. post-draw, plus optional step-up
-            if p <= draw_period:
-                margin = margin_draw
-            else:
-                margin = margin_after
-            if step_up_period > 0 and p >= step_up_period:
-                margin += step_up
-
-            # Interest accrual (during grace periods)
-            if p <= grace_periods and beginning_bal > 0:
-                interest = margin * beginning_bal * (days / 360.0)
-            else:
-                interest = 0.0
-            row["interest"] = round(interest, 6)
-
-            # Upfront fee: only at period 0 (already handled above)
-            row["upfront_fee"] = 0.0
-
-            # Commitment fee: on undrawn balance during draw period
-            if p <= draw_period:
-                undrawn = max(loan_amount - beginning_bal, 0.0)
-                commit_fee = undrawn * commit_fee_rate * (days / 360.0)
-            else:
-                commit_fee = 0.0
-            row["commitment_fee"] = round(commit_fee, 6)
-
-            # Amortization
-            if amort_profile == "Bullet":
-                if p == num_periods:
-                    amort = beginning_bal   # Full repayment at final period
-                else:
-                    amort = 0.0
-            elif amort_profile == "Ad-hoc":
-                # Look up by month offset from disbursement date
-                period_months_offset = (
-                    (p_date.year - disburse_dt.year) * 12
-                    + (p_date.month - disburse_dt.month)
-                )
-                amort = adhoc_payment(loan_amount, period_months_offset,
-                                      adhoc_table, adhoc_use_pct)
-                # Cap to remaining balance (never let balance go negative)
-                amort = min(amort, beginning_bal)
-            elif amort_profile == "Mortgage":
-                if p <= draw_period:
-                    amort = 0.0
-                else:
-                    # Fixed PMT minus the mortgage-rate interest component
-                    mort_interest = mortgage_r * beginning_bal
-                    amort = max(0.0, min(mortgage_pmt - mort_interest, beginning_bal))
-                    # On the final period, clear any remaining balance
-                    if p == num_periods:
-                        amort = beginning_bal
-            else:
-                amort = 0.0
-
-            row["amortization"] = round(amort, 6)
-
-            ending_bal = beginning_bal + row["draws"] - amort
-            row["ending_bal"] = round(max(ending_bal, 0.0), 6)
-            balance = row["ending_bal"]
-
-        schedule.append(row)
-
-    return schedule
+    # Period dates, day counts and month offsets from disbursement
+    dates = period_dates(disburse_dt, num_periods, freq_months)
+    days_arr = np.zeros(num_periods + 1, dtype=np.int64)
+    days_arr[1:] = np.diff(dates).astype(np.int64)
+    # Period p is exactly p × freq_months calendar months after disbursement
+    month_offsets = np.arange(num_periods + 1, dtype=np.float64) * freq_months
+
+    if amort_profile == "Ad-hoc":
+        amort_raw = adhoc_amortization(loan_amount, month_offsets,
+                                       adhoc_table, adhoc_use_pct)
+    elif amort_profile == "Mortgage":
+        amort_raw = mortgage_amortization(loan_amount, num_periods, draw_period,
+                                          mortgage_pmt, mortgage_r)
+    else:
+        amort_raw = np.zeros(num_periods + 1, dtype=np.float64)
+
+    size = num_periods + 1
+    beginning_bal, amortization, ending_bal = balance_path(
+        loan_amount, num_periods, draw_period,
+        AMORT_PROFILE_CODES.get(amort_profile, -1), amort_raw)
+
+    # Everything else is elementwise over the balance column, selected by
+    # per-period masks instead of branches
+    period_idx = np.arange(size)
+    in_draw    = period_idx <= draw_period
+    stepped    = (step_up_period > 0) & (period_idx >= step_up_period)
+    in_grace   = period_idx <= grace_periods
+    year_frac  = days_arr / 360.0
+
+    # Margin: draw vs. post-draw, plus optional step-up
+    margin = np.where(in_draw, margin_draw, margin_after) + np.where(stepped, step_up, 0.0)
+
+    # Interest accrual (during grace periods, on a positive balance); period 0
+    # has no days, so no accrual
+    interest = np.where(in_grace & (beginning_bal > 0),
+                        margin * beginning_bal * year_frac, 0.0)
+
+    # Commitment fee: on undrawn balance during draw period
+    undrawn        = np.maximum(loan_amount - beginning_bal, 0.0)
+    commitment_fee = np.where(in_draw, undrawn * commit_fee_rate * year_frac, 0.0)
+
+    # Single draw and upfront fee at period 0 in this model
+    draws = np.zeros(size, dtype=np.float64)
+    draws[0] = loan_amount
+    upfront_fee = np.zeros(size, dtype=np.float64)
+    upfront_fee[0] = loan_amount * upfront_fee_rate
+
+    return Schedule(
+        period=np.arange(size, dtype=np.int64),
+        date=dates,
+        days=days_arr,
+        beginning_bal=beginning_bal,
+        draws=draws,
+        amortization=amortization,
+        interest=interest,
+        upfront_fee=upfront_fee,
+        commitment_fee=commitment_fee,
+        ending_bal=ending_bal,
+    )
 
 
 # ---------------------------------------------------------------------------
 # Cash flow arrays & IRR
 # ---------------------------------------------------------------------------
 
-def build_cashflow_arrays(schedule: list, draw_period: int) -> dict:
+def build_cashflow_arrays(schedule: Schedule, draw_period: int) -> np.ndarray:
     """
     Build the four cash flow arrays (T, U, V, Z) from the amortization schedule.
 
+    Returns one contiguous (3, n) float64 array with rows T, U, V.
+
     From lender's perspective:
       positive = inflow (interest received, principal repaid)
       negative = outflow (loan disbursed)
@@ -231,42 +414,84 @@ def build_cashflow_arrays(schedule: list, draw_period: int) -> dict:
     Column V: U + Commitment Fee (= All-in Margin)
     Column Z: V + Reserve (not implemented in MVP; same as V)
     """
-    col_T, col_U, col_V = [], [], []
+    cfs = np.empty((3, schedule.period.size), dtype=np.float64)
+    np.add(schedule.interest, schedule.amortization, out=cfs[0])
+    np.subtract(cfs[0], schedule.draws, out=cfs[0])
+    np.add(cfs[0], schedule.upfront_fee, out=cfs[1])
+    np.add(cfs[1], schedule.commitment_fee, out=cfs[2])
 
-    for row in schedule:
-        cf_base = row["interest"] + row["amortization"] - row["draws"]
-        col_T.append(cf_base)
-        col_U.append(cf_base + row["upfront_fee"])
-        col_V.append(cf_base + row["upfront_fee"] + row["commitment_fee"])
+    return cfs
 
-    return {"T": col_T, "U": col_U, "V": col_V}
 
+def irr_newton(cf: np.ndarray, guess: float = 0.0,
+               tol: float = 1e-12, max_iter: int = 50) -> float:
+    """
+    Per-period IRR via Newton-Raphson on the NPV polynomial in x = 1 / (1 + r).
 
-def annualized_irr(cashflows: list, frequency: str) -> float:
-    """Calculate IRR and annualize by payment frequency multiplier."""
+    NPV(x) = SUM(cf[t] × x^t); each step evaluates NPV and its derivative as two
+    dot products against the same power vector. Returns NaN if the iteration does
+    not converge, so the caller can fall back to npf.irr.
+    """
+    t   = np.arange(cf.size, dtype=np.float64)
+    dcf = cf[1:] * t[1:]
+    x   = 1.0 / (1.0 + guess)
+
+    for _ in range(max_iter):
+        powers = x ** t
+        npv    = cf @ powers
+        dnpv   = dcf @ powers[:-1]
+        if dnpv == 0 or not np.isfinite(npv):
+            return np.nan
+        step = npv / dnpv
+        x -= step
+        if x <= 0:
+            return np.nan
+        if abs(step) <= tol * x:
+            return 1.0 / x - 1.0
+
+    return np.nan
+
+
+def annualized_irr(cashflows, frequency: str, guess: float = 0.0) -> float:
+    """
+    Calculate IRR and annualize by payment frequency multiplier.
+
+    guess: annualized starting rate for the solver (e.g. a neighbouring column's IRR).
+    """
     multiplier = {"Monthly": 12, "Quarterly": 4, "Semiannually": 2}[frequency]
     try:
-        arr = np.array(cashflows, dtype=float)
-        if np.all(arr == 0):
+        arr = np.asarray(cashflows, dtype=np.float64)
+        # No sign change (incl. all zeros) means no IRR; skip the solver entirely
+        if arr.size < 2 or np.all(arr >= 0) or np.all(arr <= 0):
             return 0.0
-        irr_per_period = npf.irr(arr)
+        irr_per_period = irr_newton(arr, guess / multiplier)
+        if np.isnan(irr_per_period):
+            irr_per_period = npf.irr(arr)
         if irr_per_period is None or np.isnan(irr_per_period):
             return 0.0
-        return irr_per_period * multiplier
+        return float(irr_per_period * multiplier)
     except Exception:
         return 0.0
 
 
-def calculate_irr_components(schedule: list, params: dict) -> dict:
-    """Return the IRR component breakdown."""
+def calculate_irr_components(params: dict) -> dict:
+    """Return the IRR component breakdown, memoized on the same key as build_schedule."""
+    return dict(_irr_components_cached(_freeze(params)))
+
+
+@functools.lru_cache(maxsize=128)
+def _irr_components_cached(frozen_params: str) -> dict:
+    params      = json.loads(frozen_params)
+    schedule    = _build_schedule_cached(frozen_params)
     draw_period = int(params["draw_period"])
     frequency   = params["frequency"]
 
-    cfs = build_cashflow_arrays(schedule, draw_period)
+    cf_T, cf_U, cf_V = build_cashflow_arrays(schedule, draw_period)
 
-    ir_spread   = annualized_irr(cfs["T"], frequency)
-    irr_with_uf = annualized_irr(cfs["U"], frequency)
-    irr_all_in  = annualized_irr(cfs["V"], frequency)
+    # Each solve seeds the next: the columns differ only by fees and have nearby roots.
+    ir_spread   = annualized_irr(cf_T, frequency)
+    irr_with_uf = annualized_irr(cf_U, frequency, guess=ir_spread)
+    irr_all_in  = annualized_irr(cf_V, frequency, guess=irr_with_uf)
 
     upfront_impact    = irr_with_uf - ir_spread
     commitment_impact = irr_all_in - irr_with_uf
@@ -280,47 +505,40 @@ def calculate_irr_components(schedule: list, params: dict) -> dict:
 
 
 # ---------------------------------------------------------------------------
-# Weighted Average Life
+# Weighted Average Life & validation
 # ---------------------------------------------------------------------------
 
-def calculate_wal(schedule: list, frequency_months: int) -> float:
+def summarize(schedule: Schedule, loan_amount: float, frequency_months: int) -> tuple:
     """
-    WAL = SUM(period_months × amortization / total_amortization) / 12
+    Compute WAL and the validation checks from one set of column reductions.
 
+    WAL = SUM(period_months × amortization / total_amortization) / 12
     period_months = period_index × frequency_months
-    """
-    total_amort = sum(row["amortization"] for row in schedule)
-    if total_amort == 0:
-        return 0.0
-
-    weighted = 0.0
-    for row in schedule:
-        if row["amortization"] > 0:
-            period_months_offset = row["period"] * frequency_months
-            weighted += period_months_offset * (row["amortization"] / total_amort)
 
-    return round(weighted / 12.0, 4)
-
-
-# ---------------------------------------------------------------------------
-# Validation
-# ---------------------------------------------------------------------------
+    Returns (wal, validation_dict).
+    """
+    total_draws = float(schedule.draws.sum())
+    total_amort = float(schedule.amortization.sum())
+    weighted    = float(np.dot(schedule.period.astype(np.float64),
+                               np.maximum(schedule.amortization, 0.0)))
+    neg_bal     = bool((schedule.ending_bal < -0.01).any())
+    final_bal   = float(schedule.ending_bal[-1])
 
-def validate(schedule: list, loan_amount: float) -> dict:
-    total_draws = sum(row["draws"] for row in schedule)
-    total_amort = sum(row["amortization"] for row in schedule)
-    final_bal   = schedule[-1]["ending_bal"]
+    if total_amort == 0:
+        wal = 0.0
+    else:
+        wal = round(weighted * frequency_months / total_amort / 12.0, 4)
 
-    draw_ok   = abs(total_draws - loan_amount) <= 1.0
-    neg_bal   = any(row["ending_bal"] < -0.01 for row in schedule)
+    draw_ok = abs(total_draws - loan_amount) <= 1.0
 
-    return {
+    validation = {
         "draws_total":   round(total_draws, 2),
         "amort_total":   round(total_amort, 2),
         "final_balance": round(final_bal, 2),
         "draw_status":   "OK" if draw_ok else "Review Draw",
         "balance_ok":    not neg_bal,
     }
+    return wal, validation
 
 
 # ---------------------------------------------------------------------------
@@ -364,33 +582,41 @@ def calculate():
         freq_months = {"Monthly": 1, "Quarterly": 3, "Semiannually": 6}[params["frequency"]]
 
         schedule   = build_schedule(params)
-        irr_comps  = calculate_irr_components(schedule, params)
-        wal        = calculate_wal(schedule, freq_months)
-        validation = validate(schedule, float(params["loan_amount"]))
+        sched_id   = schedule_id(params)
+        irr_comps  = calculate_irr_components(params)
+        wal, validation = summarize(schedule, float(params["loan_amount"]), freq_months)
 
         # Serialize schedule rows (round display values)
-        sched_out = []
-        for row in schedule:
-            sched_out.append({
-                "period":          row["period"],
-                "date":            row["date"],
-                "days":            row["days"],
-                "beginning_bal":   round(row["beginning_bal"], 2),
-                "draws":           round(row["draws"], 2),
-                "amortization":    round(row["amortization"], 2),
-                "interest":        round(row["interest"], 2),
-                "upfront_fee":     round(row["upfront_fee"], 2),
-                "commitment_fee":  round(row["commitment_fee"], 2),
-                "ending_bal":      round(row["ending_bal"], 2),
-            })
-
-        return jsonify({
-            "success":    True,
-            "schedule":   sched_out,
-            "irr":        irr_comps,
-            "wal":        wal,
-            "validation": validation,
-        })
+        sched_out = [
+            {
+                "period":          p,
+                "date":            d,
+                "days":            n,
+                "beginning_bal":   bb,
+                "draws":           dr,
+                "amortization":    am,
+                "interest":        it,
+                "upfront_fee":     uf,
+                "commitment_fee":  cf,
+                "ending_bal":      eb,
+            }
+            for p, d, n, bb, dr, am, it, uf, cf, eb in zip(*schedule.column_lists(decimals=2))
+        ]
+
+        # orjson: C serializer for the plain lists/floats in the payload; the
+        # schedule rows dominate response time
+        payload = {
+            "success":     True,
+            "schedule_id": sched_id,
+            "schedule":    sched_out,
+            "irr":         irr_comps,
+            "wal":         wal,
+            "validation":  validation,
+        }
+        return Response(
+            orjson.dumps(payload),
+            mimetype="application/json",
+        )
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
@@ -399,39 +625,53 @@ def calculate():
 @app.route("/export/csv", methods=["POST"])
 def export_csv():
     try:
-        # Merge session loan params with amortization params from request
         amort_params = request.get_json(force=True)
-        loan_params  = session.get('loan_params', {})
-        params       = {**loan_params, **amort_params}
 
-        freq_months = {"Monthly": 1, "Quarterly": 3, "Semiannually": 6}[params["frequency"]]
+        # The schedule always comes from these params, never from the id alone. When
+        # the id equals schedule_id(params), /calculate built this exact schedule and
+        # build_schedule is a cache hit; stale or foreign ids change nothing.
+        amort_params.pop("schedule_id", None)
+
+        # Merge session loan params with amortization params from request
+        loan_params = session.get('loan_params', {})
+        params      = {**loan_params, **amort_params}
 
         schedule = build_schedule(params)
 
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow([
-            "Period", "Date", "Days",
-            "Beginning Balance", "Draws", "Amortization",
-            "Interest", "Upfront Fee", "Commitment Fee", "Ending Balance"
-        ])
-        for row in schedule:
+        columns = schedule.column_lists()
+
+        def generate():
+            # Each row is written into a small reusable buffer and yielded at once
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+
+            def flush():
+                data = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                return data
+
             writer.writerow([
-                row["period"],
-                row["date"],
-                row["days"],
-                round(row["beginning_bal"], 2),
-                round(row["draws"], 2),
-                round(row["amortization"], 2),
-                round(row["interest"], 2),
-                round(row["upfront_fee"], 2),
-                round(row["commitment_fee"], 2),
-                round(row["ending_bal"], 2),
+                "Period", "Date", "Days",
+                "Beginning Balance", "Draws", "Amortization",
+                "Interest", "Upfront Fee", "Commitment Fee", "Ending Balance"
             ])
+            yield flush()
+            for p, d, n, bb, dr, am, it, uf, cf, eb in zip(*columns):
+                writer.writerow([
+                    p, d, n,
+                    f"{bb:.2f}",
+                    f"{dr:.2f}",
+                    f"{am:.2f}",
+                    f"{it:.2f}",
+                    f"{uf:.2f}",
+                    f"{cf:.2f}",
+                    f"{eb:.2f}",
+                ])
+                yield flush()
 
-        csv_data = output.getvalue()
         return Response(
-            csv_data,
+            generate(),
             mimetype="text/csv",
             headers={"Content-Disposition": "attachment; filename=amortization_schedule.csv"}
         )
@@ -441,4 +681,10 @@ def export_csv():
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    # Development server only; deploy with `gunicorn app:app` (see gunicorn.conf.py).
+    # FLASK_ENV is read here directly; Flask itself ignores it since 2.3.
+    if os.environ.get("FLASK_ENV") == "dev":
+        app.run(debug=True, port=5000)
+    else:
+        sys.exit("usage: FLASK_ENV=dev python app.py  (development server)\n"
+                 "       gunicorn app:app             (deployment)")
@@ -0,0 +1,43 @@
+"""
+Ahead-of-time build of the schedule kernel.
+
+Compiles app._schedule_kernel with numba.pycc into the native extension
+module aim_kernels (next to app.py), so workers import machine code instead
+of paying Numba's JIT compile on the first request. Run once at build time:
+
+    python build_kernels.py
+
+app.py falls back to the @njit kernel when aim_kernels is not present or its
+kernel_version() differs from app.SCHEDULE_KERNEL_VERSION (rebuild after
+changing the kernel).
+
+numba.pycc is pending deprecation in Numba (it warns on import), so
+requirements.txt caps numba below the next minor release; re-check this
+script before raising the cap.
+"""
+
+import os
+from numba.pycc import CC
+
+from app import SCHEDULE_KERNEL_VERSION, _schedule_kernel
+
+cc = CC("aim_kernels")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Argument order matches _schedule_kernel:
+#   loan_amount, num_periods, draw_period, amort_profile_code,
+#   amort_raw, out_beginning_bal, out_amortization, out_ending_bal.
+cc.export(
+    "schedule_kernel",
+    "void(f8, i8, i8, i8, f8[:], f8[:], f8[:], f8[:])",
+)(_schedule_kernel.py_func)
+
+
+
+@cc.export("kernel_version", "i8()")
+def kernel_version():
+    return SCHEDULE_KERNEL_VERSION
+
+
+if __name__ == "__main__":
+    cc.compile()
@@ -0,0 +1,22 @@
+"""
+Gunicorn settings for deployment:
+
+    gunicorn app:app
+
+preload_app imports app.py (and the aim_kernels native module, if built) once
+in the master before forking, so every worker shares those pages copy-on-write.
+
+For local development run the Werkzeug debug server instead:
+
+    FLASK_ENV=dev python app.py
+
+app.py checks FLASK_ENV=dev itself (Flask 2.3+ no longer reads FLASK_ENV);
+without it, `python app.py` exits with a usage message.
+"""
+
+import os
+
+bind        = os.environ.get("BIND", "0.0.0.0:5000")
+workers     = int(os.environ.get("WEB_CONCURRENCY", 4))
+threads     = 2
+preload_app = True